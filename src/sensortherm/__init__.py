@@ -54,4 +54,19 @@ Reexports
 # try:
 #     from _version import __version__ as __version__
 # except Exception:  # pragma: no coverage
-#     __version__ = "0.0.0"  # Placeholder value for source installs
\ No newline at end of file
+#     __version__ = "0.0.0"  # Placeholder value for source installs
+
+from .metis import (
+    AnalogOutputMode as AnalogOutputMode,
+    AsyncMetis as AsyncMetis,
+    BufferData as BufferData,
+    BufferMode as BufferMode,
+    Command as Command,
+    InternalTemperatureSensor as InternalTemperatureSensor,
+    Language as Language,
+    MeasurementChannel as MeasurementChannel,
+    Metis as Metis,
+    MetisException as MetisException,
+    Status as Status,
+    TargetingLightState as TargetingLightState
+)
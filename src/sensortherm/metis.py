@@ -6,20 +6,31 @@ How ya garn?
 """
 
 from ast import Tuple
-from collections import namedtuple
+import asyncio
+import os
+import select
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
 from enum import Enum
-from typing import Annotated, Any, Callable, Dict, List, Optional, Tuple, TypedDict
+from functools import cached_property
+from typing import Annotated, Any, Callable, Dict, Final, Generic, Iterator, List, Optional, Tuple, TypedDict, TypeVar
 from annotated_types import Ge
 
 import serial
 
+try:
+    import termios
+except ImportError: # Not available on Windows
+    termios = None
+
 class MeasurementChannel(Enum):
     """
     Measurement channel
     """
     TWO_COLOUR              = 0 # 2-colour ratiometric measurement
     SINGLE_COLOUR_CHANNEL_1 = 1 # 1 colour measurement, channel 1
-    SINGLE_COLOUR_CHANNEL_2 = 1 # 1 colour measurement, channel 2
+    SINGLE_COLOUR_CHANNEL_2 = 2 # 1 colour measurement, channel 2
 
 class AnalogOutputMode(Enum):
     """
@@ -100,59 +111,240 @@ class Status(TypedDict):
     display1 : bool
     display2 : bool
 
+@dataclass(slots=True)
 class BufferData:
     """
     Buffer data
     """
-    measured_value                  : Optional[float]
-    temperature_2_colour            : Optional[float]
-    temperature_1_colour_channel_1  : Optional[float]
-    temperature_1_colour_channel_2  : Optional[float]
-    signal_strength                 : Optional[float]
-    setpoint_value_at_ramp_function : Optional[float]
-    controller_manipulated_variable : Optional[float]
-    analog_input                    : Optional[int]
-    measured_temperature            : Optional[float]
-    status                          : Optional[Status]
+    measured_value                  : Optional[float]  = None
+    temperature_2_colour            : Optional[float]  = None
+    temperature_1_colour_channel_1  : Optional[float]  = None
+    temperature_1_colour_channel_2  : Optional[float]  = None
+    signal_strength                 : Optional[float]  = None
+    setpoint_value_at_ramp_function : Optional[float]  = None
+    controller_manipulated_variable : Optional[float]  = None
+    analog_input                    : Optional[int]    = None
+    measured_temperature            : Optional[float]  = None
+    status                          : Optional[Status] = None
 
 class MetisException(Exception):
     """
     Sensortherm METIS device exception
     """
 
+_T = TypeVar('_T')
+
+class _Reply(Generic[_T]):
+    """
+    Reply to a command queued in a pipeline
+    """
+
+    def __init__(self, parser : Callable[[bytes], _T]):
+        self._parser = parser
+        self._answer : Optional[bytes] = None
+        self._error : Optional[MetisException] = None
+
+    def result(self) -> _T:
+        """
+        Get the parsed answer, raising if the command failed
+        """
+        if self._error is not None:
+            raise self._error
+        if self._answer is None:
+            raise MetisException('Pipeline has not been sent')
+        return self._parser(self._answer)
+
+# Command bytes used on the wire, derived from the Command enum; the private
+# command helpers take these directly and only the public API goes through
+# the enum
+_CMD_REFERENCE_NUMBER_SHORT    : Final[bytes] = Command.REFERENCE_NUMBER_SHORT.value.encode('ascii')
+_CMD_REFERENCE_NUMBER_LONG     : Final[bytes] = Command.REFERENCE_NUMBER_LONG.value.encode('ascii')
+_CMD_TARGETING_LIGHT           : Final[bytes] = Command.TARGETING_LIGHT.value.encode('ascii')
+_CMD_SERIAL_NUMBER             : Final[bytes] = Command.SERIAL_NUMBER.value.encode('ascii')
+_CMD_READ_MEASURED_TEMPERATURE : Final[bytes] = Command.READ_MEASURED_TEMPERATURE.value.encode('ascii')
+_CMD_READ_TEMPERATURE_SENSOR   : Final[bytes] = Command.READ_TEMPERATURE_SENSOR.value.encode('ascii')
+_CMD_SIGNAL_STRENGTH           : Final[bytes] = Command.SIGNAL_STRENGTH.value.encode('ascii')
+_CMD_BUFFER_MODE               : Final[bytes] = Command.BUFFER_MODE.value.encode('ascii')
+_CMD_BUFFER_READ               : Final[bytes] = Command.BUFFER_READ.value.encode('ascii')
+
+_COMMAND_BYTES : Final[Dict[Command, bytes]] = {
+    command: command.value.encode('ascii') for command in Command
+}
+
+# How long the line must stay quiet to resynchronise an AsyncMetis that
+# was created without a timeout
+_ASYNC_RESYNC_QUIET_S : Final[float] = 0.1
+
+def _build_frame(address_prefix : bytes, command : bytes, data : bytes = b'') -> bytes:
+    return address_prefix + command + data + b'\r'
+
+def _build_read_frames(address_prefix : bytes) -> Tuple[Dict[MeasurementChannel, bytes],
+                                                        Dict[InternalTemperatureSensor, bytes],
+                                                        bytes]:
+    # Frames for the polled reads, built once per device
+    temperature_frames = {
+        channel: _build_frame(address_prefix, _CMD_READ_MEASURED_TEMPERATURE,
+                              b'%d' % channel.value)
+        for channel in MeasurementChannel
+    }
+    temperature_sensor_frames = {
+        sensor: _build_frame(address_prefix, _CMD_READ_TEMPERATURE_SENSOR,
+                             b'%d' % sensor.value)
+        for sensor in InternalTemperatureSensor
+    }
+    signal_strength_frame = _build_frame(address_prefix, _CMD_SIGNAL_STRENGTH)
+    return temperature_frames, temperature_sensor_frames, signal_strength_frame
+
 class Metis():
     """
     Sensortherm METIS device
+
+    On POSIX the serial port passed in is left in canonical mode with CR
+    as an end-of-line character for as long as it stays open; its
+    settings are not restored.
     """
 
     def __init__(self, address : Annotated[int, Ge(0)],
                  stream : serial.Serial,
                  debug: bool = False):
         self._address = address
+        self._addr_prefix = b'%02d' % address
         self._stream = stream
         self._stream.write(b'\r')
         self._debug = debug
-
-    def _str_command(self, command : Command, data : Optional[str] = None) -> bytes:
-        command_string = f'{self._address:02d}{command.value}{data or ""}\r'
+        self._pending : List[Tuple[bytes, _Reply[Any]]] = []
+        self._batching = False
+        self._polling = False
+        self._rx_buffer = b''
+        self._fd = self._configure_tty()
+        (self._temperature_frames,
+         self._temperature_sensor_frames,
+         self._signal_strength_frame) = _build_read_frames(self._addr_prefix)
+
+    def _configure_tty(self) -> Optional[int]:
+        # Put the tty in canonical mode with CR as end-of-line so the kernel
+        # hands back a whole answer per read(), rather than pyserial scanning
+        # for the terminator one byte at a time. Changing the port settings
+        # through pyserial afterwards switches canonical mode off again, so
+        # _read_answer() must not rely on it.
+        fileno = getattr(self._stream, 'fileno', None)
+        if termios is None or fileno is None:
+            return None
+        set_low_latency_mode = getattr(self._stream, 'set_low_latency_mode', None)
+        if set_low_latency_mode is not None:
+            try:
+                set_low_latency_mode(True)
+            except (OSError, ValueError):
+                pass # Not supported by every driver
+        try:
+            fd = fileno()
+            attributes = termios.tcgetattr(fd)
+            attributes[3] |= termios.ICANON
+            attributes[6][termios.VEOL] = b'\r'
+            termios.tcsetattr(fd, termios.TCSANOW, attributes)
+        except (OSError, termios.error, serial.SerialException):
+            return None
+        return fd
+
+    def _frame(self, command : bytes, data : bytes = b'') -> bytes:
+        return _build_frame(self._addr_prefix, command, data)
+
+    def _read_answer(self) -> bytes:
+        # Strip rather than cut the terminator: if it never arrives the
+        # partial answer is kept intact, so an error answer is still
+        # recognised by its b'no' prefix
+        if self._fd is None:
+            return self._stream.read_until(b'\r').rstrip(b'\r')
+        # Keep reading until a terminator arrives; in canonical mode that is
+        # the first read, in raw mode an answer may come in fragments and a
+        # read may run into the next answer, which is kept for later
+        timeout = self._stream.timeout
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while b'\r' not in self._rx_buffer:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            readable, _, _ = select.select([self._fd], [], [], remaining)
+            data = os.read(self._fd, 64) if readable else b''
+            if not data:
+                answer, self._rx_buffer = self._rx_buffer, b''
+                return answer
+            self._rx_buffer += data
+        answer, _, self._rx_buffer = self._rx_buffer.partition(b'\r')
+        return answer
+
+    def _str_command(self, command : bytes, data : bytes = b'') -> bytes:
+        return self._exchange(self._frame(command, data))
+
+    def _check_idle(self):
+        if self._batching:
+            raise MetisException('Cannot wait for an answer inside a pipeline')
+        if self._polling:
+            raise MetisException('Cannot send commands while polling')
+
+    def _exchange(self, frame : bytes) -> bytes:
+        self._check_idle()
         if self._debug:
-            print(command_string)
-        self._stream.write(command_string.encode('ascii'))
+            print(frame)
+        self._stream.write(frame)
         self._stream.flush()
-        answer = self._stream.read_until(b'\r')[:-1]
-        if answer == b'no':
+        answer = self._read_answer()
+        if answer[:2] == b'no':
             raise MetisException('Error sending command')
         else:
             return answer
 
-    def _int_command(self, command : Command,
-                                      data : Optional[str] = None) -> int:
+    def enqueue(self, command : Command, data : Optional[str] = None,
+                parser : Callable[[bytes], _T] = bytes) -> _Reply[_T]:
+        """
+        Queue a command in the active pipeline; the answer is passed
+        through `parser` when the reply's result() is requested
+        """
+        return self._enqueue_frame(
+            self._frame(_COMMAND_BYTES[command], data.encode('ascii') if data else b''),
+            parser)
+
+    def _enqueue_frame(self, frame : bytes, parser : Callable[[bytes], _T]) -> _Reply[_T]:
+        if not self._batching:
+            raise MetisException('No pipeline active')
+        reply = _Reply(parser)
+        self._pending.append((frame, reply))
+        return reply
+
+    @contextmanager
+    def pipeline(self) -> Iterator['Metis']:
+        """
+        Queue commands and send them in a single write when the block exits
+        """
+        if self._batching:
+            raise MetisException('Pipeline already active')
+        self._check_idle()
+        self._batching = True
+        try:
+            yield self
+            pending = self._pending
+        finally:
+            self._batching = False
+            self._pending = []
+        if not pending:
+            return
+        frames = b''.join(frame for frame, _ in pending)
+        if self._debug:
+            print(frames)
+        self._stream.write(frames)
+        self._stream.flush()
+        for _, reply in pending:
+            answer = self._read_answer()
+            if answer[:2] == b'no':
+                reply._error = MetisException('Error sending command')
+            else:
+                reply._answer = answer
+
+    def _int_command(self, command : bytes, data : bytes = b'') -> int:
         hex_string = self._str_command(command, data)
         return _parse_int(hex_string)
 
     def _targeting_light(self, state : TargetingLightState):
         # TODO I am not sure if the address is encoded in hex or decimal format; need to test
-        return self._str_command(Command.TARGETING_LIGHT, f'{state.value}')
+        return self._str_command(_CMD_TARGETING_LIGHT, b'%d' % state.value)
 
     def toggle_laser(self):
         """
@@ -172,30 +364,102 @@ class Metis():
         """
         return self._targeting_light(state = TargetingLightState.OFF)
 
+    @cached_property
+    def type_short(self) -> str:
+        """
+        Reference type, 18 digits (read once, then cached)
+        """
+        return self._str_command(_CMD_REFERENCE_NUMBER_SHORT).decode('ascii')
+
+    @cached_property
+    def type_long(self) -> str:
+        """
+        Reference type, 21 digits (read once, then cached)
+        """
+        return self._str_command(_CMD_REFERENCE_NUMBER_LONG).decode('ascii')
+
+    @cached_property
+    def serial_number(self) -> str:
+        """
+        Device serial number (read once, then cached)
+        """
+        return self._str_command(_CMD_SERIAL_NUMBER).decode('ascii')
+
     def read_type_short(self) -> str:
         """
         Read reference type, 18 digits
         """
-        return self._str_command(Command.REFERENCE_NUMBER_SHORT).decode('ascii')
+        return self.type_short
 
     def read_type_long(self) -> str:
         """
         Read reference type, 21 digits
         """
-        return self._str_command(Command.REFERENCE_NUMBER_LONG).decode('ascii')
+        return self.type_long
 
     def read_serial(self) -> str:
         """
         Read device serial number
         """
-        return self._str_command(Command.SERIAL_NUMBER).decode('ascii')
+        return self.serial_number
 
     def read_temperature(self, channel : MeasurementChannel) -> float:
         """
         Read temperature measurement channel
         """
-        return self._int_command(
-            Command.READ_MEASURED_TEMPERATURE, f'{channel.value}') / 10.0
+        return _parse_float10(self._exchange(self._temperature_frames[channel]))
+
+    def poll_temperature(self, channel : MeasurementChannel,
+                         interval_s : float = 0) -> Iterator[float]:
+        """
+        Continuously read temperature measurement channel
+
+        With no interval the next request is sent as soon as an answer
+        arrives, before the value is yielded, so the device is kept busy
+        while the caller works. Otherwise requests are spaced at least
+        `interval_s` seconds apart. Other commands raise MetisException
+        until the generator is closed.
+        """
+        self._check_idle()
+        return self._poll_temperature(self._temperature_frames[channel], interval_s)
+
+    def _poll_temperature(self, frame : bytes, interval_s : float) -> Iterator[float]:
+        self._check_idle()
+        self._polling = True
+        outstanding = False
+
+        def send() -> float:
+            nonlocal outstanding
+            if self._debug:
+                print(frame)
+            self._stream.write(frame)
+            self._stream.flush()
+            outstanding = True
+            return time.monotonic()
+
+        try:
+            sent = send()
+            while True:
+                answer = self._read_answer()
+                outstanding = False
+                if answer[:2] == b'no':
+                    raise MetisException('Error sending command')
+                if not answer:
+                    raise MetisException('No answer from device')
+                value = _parse_float10(answer)
+                if not interval_s:
+                    sent = send()
+                    yield value
+                else:
+                    yield value
+                    time.sleep(max(0.0, sent + interval_s - time.monotonic()))
+                    sent = send()
+        finally:
+            # Swallow the answer to the request still in flight so it is not
+            # mistaken for the answer to the next command
+            if outstanding:
+                self._read_answer()
+            self._polling = False
 
     def read_2_colour_temoperature(self) -> float:
         """
@@ -219,86 +483,241 @@ class Metis():
         """
         Read internal temperature sensor
         """
-        return self._int_command(Command.READ_TEMPERATURE_SENSOR,
-                                                  f'{sensor.value}') / 256.0
+        return _parse_temperature_sensor(
+            self._exchange(self._temperature_sensor_frames[sensor]))
 
     def read_temperature_sensors(self) -> Tuple[float, float]:
         """
         Read internal temperature sensors
         """
-        one = self.read_temperature_sensor(InternalTemperatureSensor.ONE)
-        two = self.read_temperature_sensor(InternalTemperatureSensor.TWO)
-        return (one, two)
+        with self.pipeline():
+            one = self._enqueue_frame(
+                self._temperature_sensor_frames[InternalTemperatureSensor.ONE],
+                _parse_temperature_sensor)
+            two = self._enqueue_frame(
+                self._temperature_sensor_frames[InternalTemperatureSensor.TWO],
+                _parse_temperature_sensor)
+        return (one.result(), two.result())
 
     def read_signal_strength(self) -> float:
         """
         Read measured signal strength
         """
-        return self._int_command(Command.SIGNAL_STRENGTH,) / 10.0
+        return _parse_float10(self._exchange(self._signal_strength_frame))
 
     def get_buffer_mode(self) -> BufferMode:
         """
         Get buffer mode
         """
-        answer = self._int_command(Command.BUFFER_MODE)
+        answer = self._int_command(_CMD_BUFFER_MODE)
         return BufferMode(answer)
 
     def set_buffer_mode(self, buffer_mode : BufferMode):
         """
         Set buffer mode
         """
-        self._str_command(Command.BUFFER_MODE, f'{buffer_mode.value:02x}')
+        self._str_command(_CMD_BUFFER_MODE, b'%02x' % buffer_mode.value)
 
-    def read_buffer(self):
+    def read_buffer(self) -> BufferData:
         """
         Read buffer
         """
-        answer = self._str_command(Command.BUFFER_READ)
-        buffer = BufferData #(None, None, None, None, None, None, None, None, None, None)
-        fields : List[_Field] = [
-            _Field(buffer.temperature_2_colour,            4, _parse_float,         (10,)),
-            _Field(buffer.temperature_1_colour_channel_1,  4, _parse_float,         (10,)),
-            _Field(buffer.temperature_1_colour_channel_2,  4, _parse_float,         (10,)),
-            _Field(buffer.setpoint_value_at_ramp_function, 4, _parse_float,         (10,)),
-            _Field(buffer.controller_manipulated_variable, 4, _parse_float,         (10,)),
-            _Field(buffer.signal_strength,                 4, _parse_float,         (10,)),
-            _Field(buffer.data_status_byte_0,              2, _parse_data_status_0,    ()),
-            _Field(buffer.data_status_byte_1,              2, _parse_data_status_1,    ()),
-            _Field(buffer.data_status_byte_2,              2, _parse_data_status_2,    ()),
-            _Field(buffer.data_status_byte_3,              2, _parse_data_status_3,    ()),
-            _Field(buffer.analog_input,                    4, _parse_int,              ()),
-            _Field(buffer._l_unused,                       4, _noop,                   ()),
-            _Field(buffer.measured_temperature,            4, _parse_float,         (10,)),
-            _Field(buffer._m_unused,                       4, _noop,                   ())
-        ]
-        data : Dict[str, Any] = {}
-
-        index : int = 0
-        for field in fields:
-            field_data : bytes = answer[index:index + field.length]
-            if self._debug:
-                print(f'field: {field.name}, ' +
-                      f'index: {index}, ' +
-                      f'field_length: {field.length}, ' +
-                      f'data:{field_data}')
-            args = field.arguments
-            value = field.parser(field_data, *args)
-            field.name = value
-            index = index + field.length
-            if index >= len(answer):
+        return _parse_buffer(self._str_command(_CMD_BUFFER_READ), self._debug)
+
+class AsyncMetis():
+    """
+    Sensortherm METIS device on an asyncio stream
+
+    Commands to one device are serialised, but several devices can be
+    polled concurrently from a single thread, e.g. with asyncio.gather().
+    The read methods match Metis, awaited. The identity values have no
+    cached properties here: read_serial(), read_type_short() and
+    read_type_long() read once and then cache. pipeline() and
+    poll_temperature() are not provided.
+    The stream pair can be opened with pyserial-asyncio:
+
+        reader, writer = await serial_asyncio.open_serial_connection(
+            url='/dev/ttyUSB0', baudrate=115_200, parity=serial.PARITY_EVEN)
+        m3 = AsyncMetis(0, reader, writer)
+
+    Each exchange must complete within `timeout` seconds (None waits
+    forever). If it times out or is cancelled, answers still on their
+    way are discarded before the next command is sent.
+    """
+
+    def __init__(self, address : Annotated[int, Ge(0)],
+                 reader : asyncio.StreamReader,
+                 writer : asyncio.StreamWriter,
+                 timeout : Optional[float] = 1.0,
+                 debug: bool = False):
+        self._address = address
+        self._addr_prefix = b'%02d' % address
+        self._reader = reader
+        self._writer = writer
+        self._writer.write(b'\r')
+        self._timeout = timeout
+        self._debug = debug
+        self._lock = asyncio.Lock()
+        self._out_of_step = False
+        self._identity : Dict[bytes, str] = {}
+        (self._temperature_frames,
+         self._temperature_sensor_frames,
+         self._signal_strength_frame) = _build_read_frames(self._addr_prefix)
+
+    def _frame(self, command : bytes, data : bytes = b'') -> bytes:
+        return _build_frame(self._addr_prefix, command, data)
+
+    async def _resync(self):
+        # Discard answers to an abandoned exchange: keep reading until the
+        # line has been quiet for a whole timeout period
+        quiet = self._timeout if self._timeout is not None else _ASYNC_RESYNC_QUIET_S
+        while True:
+            try:
+                data = await asyncio.wait_for(self._reader.read(4096), quiet)
+            except TimeoutError:
+                break
+            if not data:
                 break
-        # If the buffer type is 0, it needs to fix the data
-        if len(answer) == 4:
-            data['measured_temperature'] = data['temperature_2_colour']
-            del data['temperature_2_colour']
+        self._out_of_step = False
+
+    async def _exchange(self, *frames : bytes) -> List[bytes]:
+        async with self._lock:
+            if self._out_of_step:
+                await self._resync()
+            if self._debug:
+                print(frames)
+            # Stays set if the exchange times out or is cancelled part-way
+            self._out_of_step = True
+            try:
+                async with asyncio.timeout(self._timeout):
+                    self._writer.write(b''.join(frames))
+                    await self._writer.drain()
+                    answers = [(await self._reader.readuntil(b'\r'))[:-1] for _ in frames]
+            except TimeoutError:
+                raise MetisException('No answer from device') from None
+            self._out_of_step = False
+        for answer in answers:
+            if answer[:2] == b'no':
+                raise MetisException('Error sending command')
+        return answers
+
+    async def _str_command(self, command : bytes, data : bytes = b'') -> bytes:
+        return (await self._exchange(self._frame(command, data)))[0]
+
+    async def _int_command(self, command : bytes, data : bytes = b'') -> int:
+        return _parse_int(await self._str_command(command, data))
+
+    async def _identity_command(self, command : bytes) -> str:
+        if command not in self._identity:
+            answer = await self._str_command(command)
+            self._identity[command] = answer.decode('ascii')
+        return self._identity[command]
+
+    async def _targeting_light(self, state : TargetingLightState):
+        return await self._str_command(_CMD_TARGETING_LIGHT, b'%d' % state.value)
+
+    async def toggle_laser(self):
+        """
+        Toggle targeting light state
+        """
+        return await self._targeting_light(state = TargetingLightState.TOGGLE)
+
+    async def laser_on(self):
+        """
+        Turn targeting light on
+        """
+        return await self._targeting_light(state = TargetingLightState.ON)
+
+    async def laser_off(self):
+        """
+        Turn targeting light off
+        """
+        return await self._targeting_light(state = TargetingLightState.OFF)
+
+    async def read_type_short(self) -> str:
+        """
+        Read reference type, 18 digits (cached after the first read)
+        """
+        return await self._identity_command(_CMD_REFERENCE_NUMBER_SHORT)
 
-        # Remove unused data
-        del data['_l_unused']
-        del data['_m_unused']
+    async def read_type_long(self) -> str:
+        """
+        Read reference type, 21 digits (cached after the first read)
+        """
+        return await self._identity_command(_CMD_REFERENCE_NUMBER_LONG)
+
+    async def read_serial(self) -> str:
+        """
+        Read device serial number (cached after the first read)
+        """
+        return await self._identity_command(_CMD_SERIAL_NUMBER)
+
+    async def read_temperature(self, channel : MeasurementChannel) -> float:
+        """
+        Read temperature measurement channel
+        """
+        answers = await self._exchange(self._temperature_frames[channel])
+        return _parse_float10(answers[0])
+
+    async def read_2_colour_temoperature(self) -> float:
+        """
+        Read 2 colour (ratiometric) temperature
+        """
+        return await self.read_temperature(MeasurementChannel.TWO_COLOUR)
+
+    async def read_single_colour_channel_1(self) -> float:
+        """
+        Read single colour temperature, channel 1
+        """
+        return await self.read_temperature(MeasurementChannel.SINGLE_COLOUR_CHANNEL_1)
+
+    async def read_single_colour_channel_2(self) -> float:
+        """
+        Read single colour temperature, channel 2
+        """
+        return await self.read_temperature(MeasurementChannel.SINGLE_COLOUR_CHANNEL_2)
+
+    async def read_temperature_sensor(self, sensor : InternalTemperatureSensor) -> float:
+        """
+        Read internal temperature sensor
+        """
+        answers = await self._exchange(self._temperature_sensor_frames[sensor])
+        return _parse_temperature_sensor(answers[0])
+
+    async def read_temperature_sensors(self) -> Tuple[float, float]:
+        """
+        Read internal temperature sensors
+        """
+        one, two = await self._exchange(
+            self._temperature_sensor_frames[InternalTemperatureSensor.ONE],
+            self._temperature_sensor_frames[InternalTemperatureSensor.TWO])
+        return (_parse_temperature_sensor(one), _parse_temperature_sensor(two))
+
+    async def read_signal_strength(self) -> float:
+        """
+        Read measured signal strength
+        """
+        answers = await self._exchange(self._signal_strength_frame)
+        return _parse_float10(answers[0])
 
-        return data
+    async def get_buffer_mode(self) -> BufferMode:
+        """
+        Get buffer mode
+        """
+        return BufferMode(await self._int_command(_CMD_BUFFER_MODE))
+
+    async def set_buffer_mode(self, buffer_mode : BufferMode):
+        """
+        Set buffer mode
+        """
+        await self._str_command(_CMD_BUFFER_MODE, b'%02x' % buffer_mode.value)
 
-_Field = namedtuple('Field', ['name', 'length', 'parser', 'arguments'])
+    async def read_buffer(self) -> BufferData:
+        """
+        Read buffer
+        """
+        answer = await self._str_command(_CMD_BUFFER_READ)
+        return _parse_buffer(answer, self._debug)
 
 class _DataStatus0(TypedDict):
     """
@@ -338,63 +757,70 @@ class _DataStatus3(TypedDict):
     display2 : bool
 
 def _parse_int(data : bytes) -> int:
-    return int(data.decode('ascii'), 16)
+    # int() parses ASCII bytes directly, no need to decode to str first
+    return int(data, 16)
 
-def _parse_float(data : bytes, divider : int) -> float:
-    return _parse_int(data) / divider
+def _parse_float10(data : bytes) -> float:
+    return _parse_int(data) / 10.0
 
-def _parse_bits(data : bytes) -> Tuple[bool, bool, bool, bool, bool, bool, bool, bool]:
-    i = _parse_int(data)
-    return (
-        (i & 1<<0) != 0,
-        (i & 1<<1) != 0,
-        (i & 1<<2) != 0,
-        (i & 1<<3) != 0,
-        (i & 1<<4) != 0,
-        (i & 1<<5) != 0,
-        (i & 1<<6) != 0,
-        (i & 1<<7) != 0
-    )
+def _parse_temperature_sensor(data : bytes) -> float:
+    return _parse_int(data) / 256.0
 
-def _parse_data_status_0(data : bytes) -> _DataStatus0:
-    bit_data = _parse_bits(data)
-    return _DataStatus0(
-        fahrenheit_active = bit_data[0],
-        digital_output_1  = bit_data[1],
-        digital_output_2  = bit_data[2],
-        digital_output_3  = bit_data[3],
-        digital_input_1   = bit_data[4],
-        digital_input_2   = bit_data[5],
-        digital_input_3   = bit_data[6]
-    )
-
-def _parse_data_status_1(data : bytes) -> _DataStatus1:
-    bit_data = _parse_bits(data)
-    return _DataStatus1(
-        controlling_active             = bit_data[0],
-        auto_tune_active               = bit_data[1],
-        auto_tune_at_controller_start  = bit_data[2],
-        device_ready                   = bit_data[3],
-        device_hardware_error          = bit_data[4],
-        controller_finished_successful = bit_data[5],
-        targeting_light_active         = bit_data[6]
-    )
-
-def _parse_data_status_2(data : bytes) -> _DataStatus2:
-    bit_data = _parse_bits(data)
-    return _DataStatus2(
-        setup0 = bit_data[0],
-        setup1 = bit_data[1],
-        setup2 = bit_data[2]
-    )
-
-def _parse_data_status_3(data : bytes) -> _DataStatus3:
-    bit_data = _parse_bits(data)
-    return _DataStatus3(
-        display0 = bit_data[0],
-        display1 = bit_data[1],
-        display2 = bit_data[2]
+def _parse_status(data : bytes) -> Status:
+    # The four status bytes arrive byte 0 first, so byte 0 ends up in the
+    # most significant byte of the word
+    i = _parse_int(data)
+    return Status(
+        fahrenheit_active              = bool(i & 1<<24),
+        digital_output_1               = bool(i & 1<<25),
+        digital_output_2               = bool(i & 1<<26),
+        digital_output_3               = bool(i & 1<<27),
+        digital_input_1                = bool(i & 1<<28),
+        digital_input_2                = bool(i & 1<<29),
+        digital_input_3                = bool(i & 1<<30),
+        controlling_active             = bool(i & 1<<16),
+        auto_tune_active               = bool(i & 1<<17),
+        auto_tune_at_controller_start  = bool(i & 1<<18),
+        device_ready                   = bool(i & 1<<19),
+        device_hardware_error          = bool(i & 1<<20),
+        controller_finished_successful = bool(i & 1<<21),
+        targeting_light_active         = bool(i & 1<<22),
+        setup0                         = bool(i & 1<<8),
+        setup1                         = bool(i & 1<<9),
+        setup2                         = bool(i & 1<<10),
+        display0                       = bool(i & 1<<0),
+        display1                       = bool(i & 1<<1),
+        display2                       = bool(i & 1<<2)
     )
 
-def _noop(_ : bytes) -> None:
-    return None
+# (slice, parser, attribute), in the order the fields are sent;
+# the unused fields at offsets 36 and 44 are skipped
+_BUFFER_LAYOUT : Tuple[Tuple[slice, Callable[[bytes], Any], str], ...] = (
+    (slice( 0,  4), _parse_float10, 'temperature_2_colour'),
+    (slice( 4,  8), _parse_float10, 'temperature_1_colour_channel_1'),
+    (slice( 8, 12), _parse_float10, 'temperature_1_colour_channel_2'),
+    (slice(12, 16), _parse_float10, 'setpoint_value_at_ramp_function'),
+    (slice(16, 20), _parse_float10, 'controller_manipulated_variable'),
+    (slice(20, 24), _parse_float10, 'signal_strength'),
+    (slice(24, 32), _parse_status,  'status'),
+    (slice(32, 36), _parse_int,     'analog_input'),
+    (slice(40, 44), _parse_float10, 'measured_temperature')
+)
+
+def _parse_buffer(answer : bytes, debug : bool = False) -> BufferData:
+    buffer = BufferData()
+    length = len(answer)
+    for field_slice, parser, name in _BUFFER_LAYOUT:
+        if field_slice.start >= length:
+            break
+        field_data = answer[field_slice]
+        if debug:
+            print(f'field: {name}, ' +
+                  f'index: {field_slice.start}, ' +
+                  f'data:{field_data}')
+        setattr(buffer, name, parser(field_data))
+    # If the buffer type is 0, it needs to fix the data
+    if length == 4:
+        buffer.measured_temperature = buffer.temperature_2_colour
+        buffer.temperature_2_colour = None
+    return buffer
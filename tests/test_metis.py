@@ -0,0 +1,231 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+from typing import List
+
+import pytest
+import serial
+
+from sensortherm.metis import (
+    AsyncMetis,
+    BufferData,
+    Command,
+    InternalTemperatureSensor,
+    MeasurementChannel,
+    Metis,
+    MetisException,
+    _parse_buffer,
+    _parse_status
+)
+
+# Buffer mode 3 record: six 4-digit values, the 8-digit status word,
+# analog input, unused, measured temperature, unused
+RECORD = (b'03e8' b'03e9' b'03ea' b'03eb' b'03ec' b'0064'
+          b'0b4a0502' b'0123' b'0000' b'03f0' b'0000')
+
+class FakeStream():
+    """
+    Stream answering each written frame from a table, without a file
+    descriptor so Metis falls back to read_until
+    """
+
+    def __init__(self, answers):
+        self.answers = answers
+        self.written : List[bytes] = []
+        self._rx = b''
+
+    def write(self, data : bytes):
+        self.written.append(data)
+        for frame in data.split(b'\r')[:-1]:
+            if frame:
+                self._rx += self.answers.get(frame, b'no') + b'\r'
+
+    def flush(self):
+        pass
+
+    def read_until(self, terminator : bytes) -> bytes:
+        answer, _, self._rx = self._rx.partition(terminator)
+        return answer + terminator
+
+class FakeAsyncWriter():
+    """
+    Writer answering each frame on a reader after `delay` seconds, each
+    further frame in the same write another `delay` later
+    """
+
+    def __init__(self, reader : asyncio.StreamReader, answers, delay : float = 0):
+        self.reader = reader
+        self.answers = answers
+        self.delay = delay
+
+    def write(self, data : bytes):
+        loop = asyncio.get_running_loop()
+        frames = [frame for frame in data.split(b'\r') if frame]
+        for i, frame in enumerate(frames):
+            if frame in self.answers:
+                loop.call_later(self.delay * (i + 1), self.reader.feed_data,
+                                self.answers[frame] + b'\r')
+
+    async def drain(self):
+        pass
+
+def test_single_colour_channels_are_distinct():
+    assert MeasurementChannel.SINGLE_COLOUR_CHANNEL_1.value == 1
+    assert MeasurementChannel.SINGLE_COLOUR_CHANNEL_2.value == 2
+    assert len(MeasurementChannel) == 3
+
+def test_parse_status():
+    status = _parse_status(b'0b4a0502')
+    assert {name for name, value in status.items() if value} == {
+        'fahrenheit_active', 'digital_output_1', 'digital_output_3',
+        'auto_tune_active', 'device_ready', 'targeting_light_active',
+        'setup0', 'setup2',
+        'display1'
+    }
+
+def test_parse_buffer():
+    buffer = _parse_buffer(RECORD)
+    assert buffer.temperature_2_colour == 100.0
+    assert buffer.temperature_1_colour_channel_1 == 100.1
+    assert buffer.temperature_1_colour_channel_2 == 100.2
+    assert buffer.setpoint_value_at_ramp_function == 100.3
+    assert buffer.controller_manipulated_variable == 100.4
+    assert buffer.signal_strength == 10.0
+    assert buffer.status == _parse_status(b'0b4a0502')
+    assert buffer.analog_input == 0x123
+    assert buffer.measured_temperature == 100.8
+
+def test_parse_buffer_mode_0():
+    assert _parse_buffer(b'03e8') == BufferData(measured_temperature=100.0)
+
+def test_read_temperature():
+    stream = FakeStream({b'01mw2': b'03e8'})
+    m3 = Metis(1, stream)
+    assert m3.read_single_colour_channel_2() == 100.0
+    assert stream.written[-1] == b'01mw2\r'
+
+def test_identity_is_read_once():
+    stream = FakeStream({b'00sn': b'12345', b'00bn': b'123456789012345678'})
+    m3 = Metis(0, stream)
+    assert m3.serial_number == '12345'
+    assert m3.read_serial() == '12345'
+    assert m3.read_type_short() == m3.type_short == '123456789012345678'
+    assert stream.written[1:] == [b'00sn\r', b'00bn\r']
+
+def test_pipeline_sends_one_write():
+    stream = FakeStream({b'00tsc0': b'1900', b'00tsc1': b'1a00'})
+    m3 = Metis(0, stream)
+    assert m3.read_temperature_sensors() == (25.0, 26.0)
+    assert stream.written[-1] == b'00tsc0\r00tsc1\r'
+
+def test_pipeline_error_does_not_block_later_replies():
+    stream = FakeStream({b'00sn': b'12345'})
+    m3 = Metis(0, stream)
+    with m3.pipeline() as p:
+        failed = p.enqueue(Command.REFERENCE_NUMBER_SHORT)
+        serial_number = p.enqueue(Command.SERIAL_NUMBER, parser=bytes.decode)
+    with pytest.raises(MetisException):
+        failed.result()
+    assert serial_number.result() == '12345'
+
+def test_commands_inside_pipeline_raise():
+    m3 = Metis(0, FakeStream({}))
+    with m3.pipeline():
+        with pytest.raises(MetisException):
+            m3.read_temperature_sensor(InternalTemperatureSensor.ONE)
+
+def test_poll_temperature_blocks_other_commands():
+    stream = FakeStream({b'00mw0': b'03e8', b'00sl': b'0064'})
+    m3 = Metis(0, stream)
+    poll = m3.poll_temperature(MeasurementChannel.TWO_COLOUR)
+    assert next(poll) == 100.0
+    with pytest.raises(MetisException):
+        m3.read_signal_strength()
+    with pytest.raises(MetisException):
+        m3.poll_temperature(MeasurementChannel.TWO_COLOUR)
+    poll.close()
+    assert m3.read_signal_strength() == 10.0
+
+def test_poll_temperature_inside_pipeline_raises_on_call():
+    m3 = Metis(0, FakeStream({}))
+    with m3.pipeline():
+        with pytest.raises(MetisException):
+            m3.poll_temperature(MeasurementChannel.TWO_COLOUR)
+
+def test_async_devices_poll_concurrently():
+    async def main():
+        devices = []
+        for answer in (b'03e8', b'0400'):
+            reader = asyncio.StreamReader()
+            writer = FakeAsyncWriter(reader, {b'00mw0': answer}, delay=0.05)
+            devices.append(AsyncMetis(0, reader, writer))
+        return await asyncio.gather(
+            *(m3.read_temperature(MeasurementChannel.TWO_COLOUR) for m3 in devices))
+    assert asyncio.run(main()) == [100.0, 102.4]
+
+def test_async_matches_sync_read_api():
+    async def main():
+        reader = asyncio.StreamReader()
+        writer = FakeAsyncWriter(reader, {b'00mw2': b'03e8', b'00sn': b'12345'})
+        m3 = AsyncMetis(0, reader, writer)
+        return (await m3.read_single_colour_channel_2(), await m3.read_serial())
+    assert asyncio.run(main()) == (100.0, '12345')
+
+def test_async_silent_device_times_out():
+    async def main():
+        reader = asyncio.StreamReader()
+        m3 = AsyncMetis(0, reader, FakeAsyncWriter(reader, {}), timeout=0.05)
+        await m3.read_signal_strength()
+    with pytest.raises(MetisException):
+        asyncio.run(main())
+
+def test_async_cancelled_exchange_is_resynchronised():
+    async def main():
+        reader = asyncio.StreamReader()
+        writer = FakeAsyncWriter(
+            reader, {b'00tsc0': b'1900', b'00tsc1': b'1a00', b'00sl': b'0064'},
+            delay=0.05)
+        m3 = AsyncMetis(0, reader, writer, timeout=0.2)
+        # Cancelled after the first of the two answers has been read
+        with pytest.raises(TimeoutError):
+            await asyncio.wait_for(m3.read_temperature_sensors(), 0.075)
+        return await m3.read_signal_strength()
+    assert asyncio.run(main()) == 10.0
+
+@pytest.fixture
+def pty_port():
+    if sys.platform == 'win32':
+        pytest.skip('needs a pseudo-terminal')
+    import pty
+    device, port = pty.openpty()
+    stream = serial.Serial(os.ttyname(port), 115_200, timeout=1)
+    os.close(port)
+    yield device, stream
+    stream.close()
+    os.close(device)
+
+def test_fragmented_answer_after_reconfigure(pty_port):
+    device, stream = pty_port
+    m3 = Metis(0, stream)
+    # Reconfiguring through pyserial puts the port back in raw mode
+    stream.timeout = 1
+
+    def reply():
+        time.sleep(0.05)
+        os.write(device, b'03')
+        time.sleep(0.05)
+        os.write(device, b'e8\r')
+
+    thread = threading.Thread(target=reply)
+    thread.start()
+    assert m3.read_signal_strength() == 100.0
+    thread.join()
+
+def test_coalesced_answers_after_reconfigure(pty_port):
+    device, stream = pty_port
+    m3 = Metis(0, stream)
+    stream.timeout = 1
+    os.write(device, b'1900\r1a00\r')
+    assert m3.read_temperature_sensors() == (25.0, 26.0)